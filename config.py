@@ -17,8 +17,9 @@ ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 INPUT_DIR = os.path.join(ROOT_DIR, "input_pdfs")
 OUTPUT_DIR = os.path.join(ROOT_DIR, "output_excels")
 LOG_DIR = os.path.join(ROOT_DIR, "logs")
+CACHE_DIR = os.path.join(ROOT_DIR, "cache")
 
-for d in [INPUT_DIR, OUTPUT_DIR, LOG_DIR]:
+for d in [INPUT_DIR, OUTPUT_DIR, LOG_DIR, CACHE_DIR]:
     os.makedirs(d, exist_ok=True)
 
 # ----------------------------------------------------------------------
@@ -27,6 +28,9 @@ for d in [INPUT_DIR, OUTPUT_DIR, LOG_DIR]:
 @dataclass
 class Config:
     DPI: int = 450
+    DPI_LOW: int | None = 300  # first OCR pass; re-render at DPI only for poor pages (None = always DPI)
+    MIN_ACCEPT_CHARS: int = 150  # low-DPI OCR text shorter than this is retried at DPI
+    MIN_ACCEPT_CONF: int = 60  # ... as is a mean word confidence below this (tesserocr only)
     CONTRAST: float = 2.0
     BIN_THRESHOLD: int = 180
     LANG: str = "eng"
@@ -34,15 +38,26 @@ class Config:
     TARGET_CROPS: List[str] = None
     MAX_PAGES: int | None = None  # None = entire PDF
     ALLOW_HINDI: bool = False
-    THREADS: int = 2
+    # cores this process may run on (honours taskset/cpuset limits, unlike cpu_count)
+    THREADS: int = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 2)
     SAVE_INTERMEDIATE_IMAGES: bool = False
     DEBUG_OCR_TEXT: bool = True
+    INCLUDE_BLOCK_TEXT: bool = False  # keep the raw block text per row (large; review/debug only)
+    USE_CACHE: bool = True  # reuse per-page text of a PDF already read with the same OCR settings
 
     FIELD_PATTERNS: Dict[str, List[str]] = None
 
     def as_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
+    def output_key(self) -> str:
+        """Stable text of the settings that change the extracted data (for cache keys)."""
+        return repr(tuple((k, v) for k, v in self.as_dict().items() if k not in RUNTIME_ONLY_FIELDS))
+
+
+# Settings that change speed or debug output but never the extracted rows
+RUNTIME_ONLY_FIELDS = frozenset({"THREADS", "SAVE_INTERMEDIATE_IMAGES", "DEBUG_OCR_TEXT", "USE_CACHE"})
+
 
 # ----------------------------------------------------------------------
 # 🧠 Default regex patterns for field detection
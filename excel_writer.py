@@ -8,52 +8,76 @@ Handles structured Excel output with multiple sheets and formatting.
 
 import os
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from typing import Dict, Any
+from typing import IO, Dict, Any, List
 
 from config import OUTPUT_DIR
 
+# Optional: xlsxwriter streams rows to disk (constant_memory); openpyxl builds the
+# whole workbook in memory first and is only used when xlsxwriter is missing.
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
 
 # ----------------------------------------------------------------------
 # 📁 Ensure output directory exists
 # ----------------------------------------------------------------------
 def ensure_dir(path: str) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
+    """Create the parent folder of `path` if it is missing."""
+    # checked on every call: the folder may be removed while the app keeps running
+    dir_path = os.path.dirname(path)
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
 
 
 # ----------------------------------------------------------------------
-# 🧩 Write styled DataFrame to sheet
+# 🎨 Header style (created once per workbook, shared by every sheet)
 # ----------------------------------------------------------------------
-def _write_sheet(writer, df: pd.DataFrame, sheet_name: str):
-    df.to_excel(writer, sheet_name=sheet_name, index=False)
-    ws = writer.sheets[sheet_name]
-
-    # header style
-    header_fill = PatternFill("solid", fgColor="ddebf7")
-    header_font = Font(bold=True, color="000000", name="Segoe UI")
-    border = Border(
-        left=Side(style="thin", color="999999"),
-        right=Side(style="thin", color="999999"),
-        top=Side(style="thin", color="999999"),
-        bottom=Side(style="thin", color="999999"),
-    )
+def _header_format(workbook):
+    return workbook.add_format({
+        "bold": True,
+        "font_color": "#000000",
+        "font_name": "Segoe UI",
+        "bg_color": "#DDEBF7",
+        "pattern": 1,
+        "border": 1,
+        "border_color": "#999999",
+        "align": "center",
+        "valign": "vcenter",
+    })
 
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = border
 
-    # autosize columns
-    for col in ws.columns:
-        max_length = 0
-        col_letter = get_column_letter(col[0].column)
-        for cell in col:
-            val = str(cell.value) if cell.value is not None else ""
-            max_length = max(max_length, len(val))
-        ws.column_dimensions[col_letter].width = min(max_length + 3, 60)
+# ----------------------------------------------------------------------
+# 📏 Column widths (longest rendered value incl. header, capped at 60)
+# ----------------------------------------------------------------------
+def _column_widths(df: pd.DataFrame) -> List[int]:
+    widths = []
+    for col in df.columns:
+        s = df[col]
+        lens = s.astype(str).str.len().mask(s.isna(), 0)
+        longest = max(int(lens.max()) if len(lens) else 0, len(str(col)))
+        widths.append(min(longest + 3, 60))
+    return widths
+
+
+# ----------------------------------------------------------------------
+# 🧩 Write styled DataFrame to sheet
+# ----------------------------------------------------------------------
+def _write_sheet(writer, df: pd.DataFrame, sheet_name: str, header_fmt, freeze_header: bool = False):
+    # constant_memory mode only keeps the current row, so every row is written whole
+    # and in order. (DataFrame.to_excel emits cells column by column and would lose
+    # all but the last column.) Missing values become blank cells.
+    ws = writer.book.add_worksheet(sheet_name)
+    ws.write_row(0, 0, [str(c) for c in df.columns], header_fmt)
+    rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    for r, row in enumerate(rows, start=1):
+        ws.write_row(r, 0, row)
+
+    for i, width in enumerate(_column_widths(df)):
+        ws.set_column(i, i, width)
+    if freeze_header:
+        ws.freeze_panes(1, 0)
 
 
 # ----------------------------------------------------------------------
@@ -62,30 +86,37 @@ def _write_sheet(writer, df: pd.DataFrame, sheet_name: str):
 def write_full_workbook(
     df: pd.DataFrame,
     summaries: Dict[str, pd.DataFrame],
-    out_path: str,
+    out_path: str | IO[bytes],
     config: Any = None,
+    data_sheet: str = "Data",
 ) -> None:
     """
     Create Excel workbook with:
       - Sheet 1: Data (all entries)
       - Sheet 2..n: Summaries (Crop, Applicant_Type)
+    `out_path` may also be a binary buffer (e.g. io.BytesIO for a download).
     """
-    ensure_dir(out_path)
-
-    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
-        _write_sheet(writer, df, "Data")
+    if isinstance(out_path, str):
+        ensure_dir(out_path)
+
+    if xlsxwriter is None:
+        print("⚠️ xlsxwriter not installed; writing Excel with openpyxl (unstyled, in memory)")
+        with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
+            df.to_excel(writer, sheet_name=data_sheet, index=False)
+            for name, sdf in summaries.items():
+                sdf.to_excel(writer, sheet_name=name[:31], index=False)
+        return
+
+    with pd.ExcelWriter(
+        out_path,
+        engine="xlsxwriter",
+        engine_kwargs={"options": {"constant_memory": True, "strings_to_urls": False}},
+    ) as writer:
+        header_fmt = _header_format(writer.book)
+        _write_sheet(writer, df, data_sheet, header_fmt, freeze_header=True)
 
         for name, sdf in summaries.items():
-            _write_sheet(writer, sdf, name[:31])  # Excel sheet name limit
-
-    # final polish
-    try:
-        wb = load_workbook(out_path)
-        ws0 = wb.active
-        ws0.freeze_panes = "A2"
-        wb.save(out_path)
-    except Exception:
-        pass
+            _write_sheet(writer, sdf, name[:31], header_fmt)  # Excel sheet name limit
 
 
 # ----------------------------------------------------------------------
@@ -6,39 +6,63 @@ Compatible with main_app.py (progress_cb, cancel_cb).
 """
 
 from __future__ import annotations
-import os, re
+import os, re, json, hashlib
+from functools import lru_cache
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any, Tuple, Callable
 from tqdm import tqdm
 
 # Local modules
-from config import DEFAULTS
+from config import DEFAULTS, CACHE_DIR
 import ocr_utils
 
 # ---------------------------- Utilities ---------------------------- #
 
 DEVANAGARI_RANGE = re.compile(r"[\u0900-\u097F]")  # strip Hindi if present
+_DEVA_TABLE = dict.fromkeys(range(0x0900, 0x0980), " ")
+
+# Precompiled patterns used on the per-block hot path
+_RE_WS = re.compile(r"[^\S\r\n]+")
+_RE_SPACES = re.compile(r"\s+")
+_RE_LINE = re.compile(r"[^\r\n ](?:[^\r\n]*[^\r\n ])?")
+_RE_NON_UPPER = re.compile(r"[^A-Z]")
+_RE_NON_ALPHA = re.compile(r"[^A-Za-z]")
+_RE_REG_ANCHOR = re.compile(r"(REG/\d{4}/\d+)", flags=re.I)
+_RE_PROD = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(q/ha|t/ha|tons/ha|ton/ha|kg/ha|q/acre|t/acre|kg/acre)", flags=re.I
+)
+_RE_PROD_VALUE = re.compile(r"^\s*([\d.]+)\s*(?:q/ha)?\s*$")
+_RE_NUM_LINE = re.compile(r"\d{1,3}(?:\.\d+)?")
+_RE_CODE_PAREN = re.compile(r"\((?!Notified|Extant|New)[^)]+\)")
+_RE_TRAILING_PUNCT = re.compile(r"[.:;]$")
+_RE_CHARTER = re.compile(
+    r"(resistant|tolerant|suitable|high\s+yield|early\s+maturity|drought|flood)\b.*", flags=re.I
+)
+_RE_T_COTTON = re.compile(r"\b(t\.|tetraploid)\s*cotton\b")
+_RE_D_COTTON = re.compile(r"\b(d\.|diploid)\s*cotton\b")
 
 def strip_non_english(s: str) -> str:
     if not isinstance(s, str):
         return ""
-    # remove Devanagari, collapse spaces
-    s = DEVANAGARI_RANGE.sub(" ", s)
-    s = re.sub(r"[^\S\r\n]+", " ", s)
-    return s.strip()
+    # remove Devanagari (most pages have none, so only translate on a hit), collapse spaces
+    if DEVANAGARI_RANGE.search(s):
+        s = s.translate(_DEVA_TABLE)
+    return _RE_WS.sub(" ", s).strip()
+
+_SHORT_LINES_OK = frozenset(("a", "i", "x"))
+
+def _split_lines(cleaned: str) -> List[str]:
+    # strip_non_english leaves single spaces as the only in-line whitespace, so each
+    # _RE_LINE match is already a stripped, space-normalized, non-empty line
+    return [
+        ln for ln in _RE_LINE.findall(cleaned)
+        # Filter noise: single chars that aren't common words, or mostly punctuation
+        if len(ln) >= 2 or ln.lower() in _SHORT_LINES_OK
+    ]
 
 def clean_lines(block: str) -> List[str]:
-    block = strip_non_english(block)
-    lines = []
-    for ln in block.splitlines():
-        ln = ln.strip()
-        if not ln: continue
-        # Filter noise: single chars that aren't common words, or mostly punctuation
-        if len(ln) < 2 and ln.lower() not in ('a', 'i', 'x'):
-            continue
-        # Normalize spaces
-        lines.append(re.sub(r"\s+", " ", ln))
-    return lines
+    return _split_lines(strip_non_english(block))
 
 def safe(s: Any, default="NA") -> str:
     if s is None:
@@ -101,27 +125,53 @@ COTTON_TAXA = [
     ("Diploid Cotton","diploid cotton|d\.\s*cotton|g.*arboreum|gossypium arboreum"),
 ]
 
+_COTTON_TAXA_RE = [(label, re.compile(pat)) for label, pat in COTTON_TAXA]
+
+# Single-pass matchers over the lexicons above. Lookahead matches are zero-width,
+# so overlapping hits (e.g. "millet" inside "pearl millet") are all reported and
+# the caller picks the winner by lexicon priority.
+_CROP_RANK = {w: i for i, w in enumerate(CROP_WORDS)}
+_RE_CROP = re.compile(" (?=(" + "|".join(map(re.escape, CROP_WORDS)) + ") )")
+
+# expand_applicant probes APPLICANT_MAP with one token prefix per distinct key length;
+# when several abbreviations match, the earliest-listed one wins
+_APPLICANT_KEY_RANK = {abbr: i for i, abbr in enumerate(APPLICANT_MAP)}
+_APPLICANT_KEY_LENS = sorted({len(abbr) for abbr in APPLICANT_MAP})
+
+_APPLICANT_TYPE_RANK = {"Farmer": 0, "Private Sector": 1, "Public / Govt": 2}
+_APPLICANT_TYPE_BY_HINT: Dict[str, str] = {}
+for _label, _hints in (
+    ("Farmer", FARMER_HINTS),
+    ("Private Sector", PRIVATE_HINTS),
+    ("Public / Govt", PUBLIC_HINTS),
+    ("Public / Govt", [k.lower() for kv in APPLICANT_MAP.items() for k in kv]),
+):
+    for _h in _hints:
+        _APPLICANT_TYPE_BY_HINT.setdefault(_h, _label)
+_RE_APPLICANT_HINT = re.compile("(?=(" + "|".join(map(re.escape, _APPLICANT_TYPE_BY_HINT)) + "))")
+
 VARIETY_TYPE_WORDS = [("Extant","extant"), ("Notified","notified"), ("New","new"), ("Hybrid","hybrid")]
 
 # ------------------------ Field Classifiers ------------------------ #
 
+@lru_cache(maxsize=4096)  # a journal repeats the same few applicants across hundreds of blocks
 def classify_applicant_type(name: str) -> str:
-    n = name.lower()
-    if any(k in n for k in FARMER_HINTS): return "Farmer"
-    if any(k in n for k in PRIVATE_HINTS): return "Private Sector"
-    if any(k in n for k in PUBLIC_HINTS): return "Public / Govt"
-    # If the expanded name is from APPLICANT_MAP we default to Public/Govt
-    for abbr, full in APPLICANT_MAP.items():
-        if abbr.lower() in n or full.lower() in n:
-            return "Public / Govt"
+    # Farmer > Private > Public; names from APPLICANT_MAP count as Public/Govt
+    best = None
+    for m in _RE_APPLICANT_HINT.finditer(name.lower()):
+        label = _APPLICANT_TYPE_BY_HINT[m.group(1)]
+        if label == "Farmer": return label
+        if best is None or _APPLICANT_TYPE_RANK[label] < _APPLICANT_TYPE_RANK[best]:
+            best = label
+    if best: return best
     return "Other" if name not in ("", "NA") else "NA"
 
 def expand_applicant(token: str) -> str:
     if not token: return "NA"
-    token_up = re.sub(r"[^A-Z]", "", token.upper())
-    for abbr, full in APPLICANT_MAP.items():
-        if token_up.startswith(abbr):
-            return full
+    token_up = _RE_NON_UPPER.sub("", token.upper())
+    hits = [token_up[:n] for n in _APPLICANT_KEY_LENS if token_up[:n] in APPLICANT_MAP]
+    if hits:
+        return APPLICANT_MAP[min(hits, key=_APPLICANT_KEY_RANK.__getitem__)]
     return token
 
 def detect_variety_type(block: str) -> str:
@@ -132,19 +182,19 @@ def detect_variety_type(block: str) -> str:
 
 def infer_crop(block: str) -> str:
     b = " " + block.lower() + " "
-    for w in CROP_WORDS:
-        if f" {w} " in b:
-            return w.capitalize()
+    found = {m.group(1) for m in _RE_CROP.finditer(b)}
+    if found:
+        return min(found, key=_CROP_RANK.__getitem__).capitalize()
     # extra: “T. Cotton / D. Cotton / Tetraploid Cotton”
-    if re.search(r"\b(t\.|tetraploid)\s*cotton\b", b): return "Cotton"
-    if re.search(r"\b(d\.|diploid)\s*cotton\b", b): return "Cotton"
+    if _RE_T_COTTON.search(b): return "Cotton"
+    if _RE_D_COTTON.search(b): return "Cotton"
     return "NA"
 
 def detect_taxonomy(block: str, crop: str) -> str:
     if crop != "Cotton": return "NA"
     b = block.lower()
-    for label, pat in COTTON_TAXA:
-        if re.search(pat, b): return label
+    for label, rx in _COTTON_TAXA_RE:
+        if rx.search(b): return label
     return "NA"
 
 def normalize_units(value: float, unit: str) -> float:
@@ -158,15 +208,15 @@ def normalize_units(value: float, unit: str) -> float:
     # unknown -> assume already q/ha
     return value
 
-def detect_productivity(block: str) -> Tuple[str, str]:
+def detect_productivity(block: str, lines: List[str] | None = None) -> Tuple[str, str]:
     """
     Return (normalized_text, unit_confidence)
     normalized_text is like '45 q/ha' or 'NA'.
+    Pass `lines` (clean_lines of an already-cleaned `block`) to skip re-cleaning.
     """
-    b = strip_non_english(block)
+    b = strip_non_english(block) if lines is None else block
     # primary explicit patterns with unit
-    pat = r"(\d+(?:\.\d+)?)\s*(q/ha|t/ha|tons/ha|ton/ha|kg/ha|q/acre|t/acre|kg/acre)"
-    m = list(re.finditer(pat, b, flags=re.I))
+    m = list(_RE_PROD.finditer(b))
     if m:
         val = float(m[-1].group(1))
         unit = m[-1].group(2)
@@ -174,8 +224,10 @@ def detect_productivity(block: str) -> Tuple[str, str]:
         if 5 <= qha <= 150:
             return (f"{round(qha,2)} q/ha", "High")
     # secondary: nice lone number lines within plausible range (q/ha)
-    for ln in clean_lines(b)[-5:]:  # last few lines often carry numeric cues
-        if re.fullmatch(r"\d{1,3}(?:\.\d+)?", ln):
+    if lines is None:
+        lines = _split_lines(b)
+    for ln in lines[-5:]:  # last few lines often carry numeric cues
+        if _RE_NUM_LINE.fullmatch(ln):
             try:
                 v = float(ln)
                 if 5 <= v <= 150:
@@ -186,200 +238,311 @@ def detect_productivity(block: str) -> Tuple[str, str]:
 def extract_variety_name(lines: List[str]) -> str:
     if not lines: return "NA"
     # If second line looks like code in parentheses, join 1st+2nd
-    if len(lines) >= 2 and re.search(r"\((?!Notified|Extant|New)[^)]+\)", lines[1]) and len(lines[1]) < 50:
+    if len(lines) >= 2 and _RE_CODE_PAREN.search(lines[1]) and len(lines[1]) < 50:
         return f"{lines[0]} {lines[1]}".strip()
     # Else if second line short (<= 30 chars) and first doesn’t end with punctuation, join
-    if len(lines) >= 2 and len(lines[1]) <= 30 and not re.search(r"[.:;]$", lines[0]):
+    if len(lines) >= 2 and len(lines[1]) <= 30 and not _RE_TRAILING_PUNCT.search(lines[0]):
         return f"{lines[0]} {lines[1]}".strip()
     return lines[0].strip()
 
 def infer_applicant_from_header(lines: List[str]) -> str:
     if not lines: return "NA"
     token = lines[0].split()[0]
-    token = re.sub(r"[^A-Za-z]", "", token)
+    token = _RE_NON_ALPHA.sub("", token)
     return expand_applicant(token) if token else "NA"
 
-def parse_taxonomy_charter(block: str) -> Tuple[str,str]:
+def parse_taxonomy_charter(block: str, crop: str | None = None) -> Tuple[str,str]:
     """
     Returns (taxonomy, charter_hint). Charter hint is any phrase that looks like a
     short characterization signal (e.g., disease resistance/yield claim) if present.
+    `crop` is inferred from the block unless the caller already has it.
     """
-    crop = infer_crop(block)
+    if crop is None:
+        crop = infer_crop(block)
     taxonomy = detect_taxonomy(block, crop)
     # charter hint - look for small descriptive chunks (very light heuristic)
     charter = "NA"
-    m = re.search(r"(resistant|tolerant|suitable|high\s+yield|early\s+maturity|drought|flood)\b.*", block, flags=re.I)
+    m = _RE_CHARTER.search(block)
     if m:
         charter = m.group(0).strip()
-        charter = re.sub(r"\s+", " ", charter)
+        charter = _RE_SPACES.sub(" ", charter)
         if len(charter) > 100: charter = charter[:100] + "…"
     return taxonomy, charter
 
 # ---------------------- Block → Entry Parsing ---------------------- #
 
+# Field order of the tuples produced by _parse_clean_block
+BLOCK_FIELDS = (
+    "Variety_Name", "Crop", "Variety_Type", "Applicant", "Applicant_Type",
+    "Charter_of_Crop", "Taxonomy", "Productivity", "Productivity_Confidence",
+    "Distinctiveness", "Developer_or_Breeder", "Block_Text",
+)
+
+# Output column order of extract_to_dataframe (before Audit_Flags)
+OUTPUT_COLUMNS = (
+    "Reg_No","Variety_Name","Crop","Variety_Type","Applicant","Applicant_Type",
+    "Charter_of_Crop","Taxonomy","Productivity","Productivity_Confidence",
+    "Distinctiveness","Developer_or_Breeder","Page_Number","Block_Text",
+)
+
+# Few distinct values per file: stored as pandas categoricals
+CATEGORY_COLUMNS = ("Crop", "Applicant_Type", "Variety_Type", "Productivity_Confidence", "Audit_Flags")
+
 def parse_block(block: str) -> Dict[str, Any]:
-    block = strip_non_english(block)
-    lines = clean_lines(block)
-
-    entry: Dict[str, Any] = {
-        "Variety_Name": "NA",
-        "Crop": "NA",
-        "Variety_Type": "NA",
-        "Applicant": "NA",
-        "Applicant_Type": "NA",
-        "Charter_of_Crop": "NA",
-        "Taxonomy": "NA",
-        "Productivity": "NA",
-        "Productivity_Confidence": "Low",
-        "Distinctiveness": "NA",
-        "Developer_or_Breeder": "NA",
-        "Block_Text": safe(block),
-    }
+    return dict(zip(BLOCK_FIELDS, _parse_clean_block(strip_non_english(block))))
 
+def _parse_clean_block(block: str, keep_text: bool = True) -> Tuple[Any, ...]:
+    """
+    parse_block() for a block that has already been through strip_non_english().
+    Returns the field values as a tuple in BLOCK_FIELDS order; Block_Text is ""
+    unless `keep_text`.
+    """
+    block_text = safe(block) if keep_text else ""
+    lines = _split_lines(block)
     if not lines:
-        return entry
-
-    entry["Variety_Name"] = extract_variety_name(lines)
-    entry["Crop"] = infer_crop(block)
-    entry["Variety_Type"] = detect_variety_type(block)
+        return (
+            "NA", "NA", "NA", "NA", "NA",
+            "NA", "NA", "NA", "Low",
+            "NA", "NA", block_text,
+        )
 
-    prod, conf = detect_productivity(block)
-    entry["Productivity"] = prod
-    entry["Productivity_Confidence"] = conf
+    variety = extract_variety_name(lines)
+    crop = infer_crop(block)
+    variety_type = detect_variety_type(block)
+    prod, conf = detect_productivity(block, lines)
 
     # Applicant / Breeder
     applicant = infer_applicant_from_header(lines)
-    entry["Applicant"] = applicant
-    entry["Developer_or_Breeder"] = applicant
-    entry["Applicant_Type"] = classify_applicant_type(applicant)
+    applicant_type = classify_applicant_type(applicant)
 
     # Taxonomy & charter hints
-    taxonomy, charter = parse_taxonomy_charter(block)
-    entry["Taxonomy"] = taxonomy
-    entry["Charter_of_Crop"] = charter
+    taxonomy, charter = parse_taxonomy_charter(block, crop)
 
-    return entry
+    return (
+        variety, crop, variety_type, applicant, applicant_type,
+        charter, taxonomy, prod, conf,
+        "NA", applicant, block_text,
+    )
 
 # --------------------- Page Text → Entries ------------------------ #
 
-def parse_entries_from_text(text: str) -> List[Dict[str, Any]]:
-    entries: List[Dict[str, Any]] = []
+def _parse_page_rows(text: str, keep_text: bool = True) -> List[Tuple[Any, ...]]:
+    """Rows of (Reg_No, *BLOCK_FIELDS) for every registration block on a page."""
+    rows: List[Tuple[Any, ...]] = []
     text = strip_non_english(text)
 
-    # split by the registration anchor
-    anchor = re.compile(r"(REG/\d{4}/\d+)", flags=re.I)
-    chunks = re.split(anchor, text)
-
-    if len(chunks) < 2:
-        return entries
-
-    for i in range(1, len(chunks), 2):
-        reg_no = chunks[i].strip()
-        block = chunks[i+1] if i+1 < len(chunks) else ""
+    # each block runs from the end of one registration anchor to the start of the next
+    matches = list(_RE_REG_ANCHOR.finditer(text))
+    for i, m in enumerate(matches):
+        reg_no = m.group(1).strip()
+        end = matches[i+1].start() if i+1 < len(matches) else len(text)
+        block = text[m.end():end]
         # skip tiny noise blocks
         if len(block.strip()) < 15: 
             continue
         # Must contain at least a crop word somewhere; if none, still keep (crop-agnostic mode),
         # but we’ll try inferring anyway.
-        entry = parse_block(block)
-        entry["Reg_No"] = reg_no
-        entries.append(entry)
+        # `text` is already cleaned, so the slice only needs trimming
+        rows.append((reg_no,) + _parse_clean_block(block.strip(), keep_text))
 
-    return entries
+    return rows
+
+def parse_entries_from_text(text: str) -> List[Dict[str, Any]]:
+    keys = ("Reg_No",) + BLOCK_FIELDS
+    return [dict(zip(keys, row)) for row in _parse_page_rows(text)]
+
+# ----------------------- Text Cache ------------------------------- #
+
+# Bump when the text extraction itself changes (rendering, preprocessing, OCR
+# fallback rules) so entries written by older code are no longer matched.
+TEXT_CACHE_VERSION = 2
+# Oldest-used entries are deleted once the cached texts exceed this
+TEXT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+def file_digest(pdf_path: str) -> str:
+    """blake2b-128 hex digest of a file's bytes (what extract_to_dataframe's content_digest expects)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _cache_key(content_digest: str, cfg) -> str:
+    """Digest of the PDF's content digest plus everything that changes the extracted text."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{TEXT_CACHE_VERSION}".encode())
+    h.update(content_digest.encode())
+    h.update(repr((cfg.DPI, cfg.DPI_LOW, cfg.MIN_ACCEPT_CHARS, cfg.MIN_ACCEPT_CONF,
+                   cfg.LANG, cfg.CONTRAST, cfg.BIN_THRESHOLD, ocr_utils.OCR_BACKEND)).encode())
+    return h.hexdigest()
+
+def _load_cached_texts(key: str) -> List[str] | None:
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            texts = json.load(f)
+        os.utime(path)  # mark as recently used for _prune_text_cache
+        return texts
+    except (OSError, ValueError):
+        return None
+
+def _prune_text_cache() -> None:
+    try:
+        entries = [e for e in os.scandir(CACHE_DIR) if e.name.endswith(".json") and e.is_file()]
+        stats = {e.path: e.stat() for e in entries}
+    except OSError:
+        return
+    total = sum(st.st_size for st in stats.values())
+    for path in sorted(stats, key=lambda p: stats[p].st_mtime):
+        if total <= TEXT_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= stats[path].st_size
+
+def _save_cached_texts(key: str, texts: List[str]) -> None:
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(texts, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        return  # caching is best-effort
+    _prune_text_cache()
 
 # ----------------------- Orchestrator ----------------------------- #
 
+# Parsing runs at roughly 4 MB of page text per second per core, and starting a
+# worker pool costs about half a second: only documents with this much text are
+# worth a pool of their own. A caller's already running executor has no start-up
+# cost, only per-page IPC, so it is used from PARALLEL_PARSE_MIN_PAGES pages.
+PARALLEL_PARSE_MIN_CHARS = 8_000_000
+PARALLEL_PARSE_MIN_PAGES = 32
+
+def _parse_one(item: Tuple[int, str, bool]) -> Tuple[int, List[Tuple[Any, ...]]]:
+    """Parse one page of text; module-level so it can be shipped to worker processes."""
+    page_no, page_text, keep_text = item
+    return page_no, _parse_page_rows(page_text, keep_text)
+
 def extract_to_dataframe(
     pdf_path: str,
     config=None,
     progress_cb: Callable[[float, Dict[str, Any]], None] | None = None,
-    cancel_cb: Callable[[], bool] | None = None
+    cancel_cb: Callable[[], bool] | None = None,
+    executor: ProcessPoolExecutor | None = None,
+    content_digest: str | None = None,
 ) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame]]:
     """
     Full pipeline: OCR/native text -> parse -> DataFrame (+ summaries).
+    `executor` (see ocr_utils.ocr_pool) runs both the OCR and the parse stage
+    instead of per-call pools; the caller owns it.
+    `content_digest` (see file_digest) spares re-hashing a file the caller has
+    already hashed.
     """
     cfg = config or DEFAULTS
 
-    # 1) Hybrid extract
-    texts = ocr_utils.hybrid_extract_text(pdf_path, cfg, progress_cb, cancel_cb)
+    # 1) Hybrid extract (OCR dominates, so reuse a previous read of the same file)
+    key = _cache_key(content_digest or file_digest(pdf_path), cfg) if cfg.USE_CACHE else None
+    texts = _load_cached_texts(key) if key else None
+    if texts is None:
+        texts = ocr_utils.hybrid_extract_text(pdf_path, cfg, progress_cb, cancel_cb, executor=executor)
+        # don't persist partial reads or OCR failures
+        cancelled = bool(cancel_cb and cancel_cb())
+        if key and not cancelled and not any(t.startswith(ocr_utils.OCR_ERROR_PREFIX) for t in texts):
+            _save_cached_texts(key, texts)
+    elif progress_cb:
+        progress_cb(1.0, {"page": len(texts), "stage": "cache"})
     total = len(texts) if texts else 1
 
-    # 2) Parse per page
-    rows: List[Dict[str, Any]] = []
-    for i, page_text in enumerate(tqdm(texts, desc="Parsing pages"), start=1):
-        if cancel_cb and cancel_cb(): break
-        page_entries = parse_entries_from_text(page_text)
-        for e in page_entries:
-            e["Page_Number"] = i
-        rows.extend(page_entries)
-        if progress_cb: progress_cb(i/total, {"page": i, "stage": "parse"})
+    # 2) Parse per page (pure-Python regex work, so fan out to processes, not threads)
+    #    Rows are accumulated straight into per-column lists.
+    cols: Dict[str, List[Any]] = {c: [] for c in OUTPUT_COLUMNS}
+    row_cols = [cols[c] for c in ("Reg_No",) + BLOCK_FIELDS]
+    items = [(i, t, cfg.INCLUDE_BLOCK_TEXT) for i, t in enumerate(texts, start=1)]
+    workers = max(1, cfg.THREADS or 1)
+    pool = None
+    if executor is not None:
+        if len(items) >= PARALLEL_PARSE_MIN_PAGES:
+            pool = executor
+    elif workers > 1 and sum(map(len, texts)) >= PARALLEL_PARSE_MIN_CHARS:
+        # same start method as the OCR pool, so the two paths never mix fork and forkserver
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=ocr_utils.pool_mp_context())
+    results = pool.map(_parse_one, items, chunksize=8) if pool else map(_parse_one, items)
+    try:
+        for i, page_rows in tqdm(results, total=len(items), desc="Parsing pages"):
+            if cancel_cb and cancel_cb(): break
+            if page_rows:
+                for col, values in zip(row_cols, zip(*page_rows)):
+                    col.extend(values)
+                cols["Page_Number"].extend([i] * len(page_rows))
+            if progress_cb: progress_cb(i/total, {"page": i, "stage": "parse"})
+    finally:
+        if pool is not None and pool is executor:
+            results.close()  # drop this file's queued pages, leave the shared pool running
+        elif pool:
+            pool.shutdown(cancel_futures=True)
 
     # 3) DataFrame assembly
-    df = pd.DataFrame(rows)
-
-    required = [
-        "Reg_No","Variety_Name","Crop","Variety_Type","Applicant","Applicant_Type",
-        "Charter_of_Crop","Taxonomy","Productivity","Productivity_Confidence",
-        "Distinctiveness","Developer_or_Breeder","Page_Number","Block_Text"
-    ]
-    for c in required:
-        if c not in df.columns: df[c] = "NA"
-    df = df[required].drop_duplicates(subset=["Reg_No"]).reset_index(drop=True)
+    df = pd.DataFrame(cols).drop_duplicates(subset=["Reg_No"]).reset_index(drop=True)
+    if cfg.INCLUDE_BLOCK_TEXT:
+        df["Block_Text"] = df["Block_Text"].astype("category")
+    # numeric q/ha alongside the display string, for audits and analytics
+    df.insert(
+        df.columns.get_loc("Productivity") + 1,
+        "Productivity_Value",
+        pd.to_numeric(df["Productivity"].astype(str).str.extract(_RE_PROD_VALUE, expand=False), errors="coerce"),
+    )
 
     # 4) Audit flags (row-level)
-    df["Audit_Flags"] = df.apply(_row_audit_flags, axis=1)
+    df["Audit_Flags"] = _audit_flags(df)
+
+    # low-cardinality labels: one code book per column instead of a Python str per row;
+    # page numbers fit a small unsigned int. Productivity_Value stays float64 so the
+    # exported q/ha figures keep their exact decimal values.
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    df["Page_Number"] = pd.to_numeric(df["Page_Number"], downcast="unsigned")
 
     # 5) Summaries
     summaries: Dict[str, pd.DataFrame] = {}
     if not df.empty:
-        summaries["Summary_Crop"] = (
-            df.groupby("Crop")["Reg_No"].count().reset_index(name="Count").sort_values("Count", ascending=False)
-        )
-        summaries["Summary_Applicant_Type"] = (
-            df.groupby("Applicant_Type")["Reg_No"].count().reset_index(name="Count").sort_values("Count", ascending=False)
-        )
-        summaries["Summary_Variety_Type"] = (
-            df.groupby("Variety_Type")["Reg_No"].count().reset_index(name="Count").sort_values("Count", ascending=False)
-        )
+        # value_counts is one hash pass per column and comes back sorted by count
+        for col in ("Crop", "Applicant_Type", "Variety_Type"):
+            summaries[f"Summary_{col}"] = df[col].value_counts().rename_axis(col).reset_index(name="Count")
 
     return df, summaries
 
 # ------------------------- Audits -------------------------------- #
 
-def _row_audit_flags(r: pd.Series) -> str:
-    flags = []
-
-    if r.get("Variety_Name","NA") in ("NA",""):
-        flags.append("no_variety_name")
-
-    crop = r.get("Crop","NA")
-    if crop == "NA":
-        flags.append("crop_unknown")
-
-    vt = r.get("Variety_Type","NA")
-    if vt == "NA":
-        flags.append("variety_type_missing")
-
-    prod = r.get("Productivity","NA")
-    if prod == "NA":
-        flags.append("productivity_missing")
-    else:
-        try:
-            val = float(str(prod).replace("q/ha","").strip())
-            if not (5 <= val <= 150):
-                flags.append("productivity_out_of_range")
-        except:
-            flags.append("productivity_unparsable")
-
-    if r.get("Applicant","NA") == "NA":
-        flags.append("applicant_missing")
-
-    # Cotton taxonomy sanity
-    if crop == "Cotton" and r.get("Taxonomy","NA") == "NA":
-        # OK to be NA, but helpful to nudge review
-        flags.append("cotton_taxonomy_unknown")
+def _audit_flags(df: pd.DataFrame) -> pd.Series:
+    """
+    Row-level audit flags computed column-wise: one boolean mask per check,
+    joined into a comma-separated tag string ("OK" when nothing fired).
+    """
+    crop = df["Crop"]
+    prod_missing = df["Productivity"].eq("NA")
+    prod_val = df["Productivity_Value"]
+
+    checks = [
+        (df["Variety_Name"].isin(["NA", ""]), "no_variety_name"),
+        (crop.eq("NA"), "crop_unknown"),
+        (df["Variety_Type"].eq("NA"), "variety_type_missing"),
+        (prod_missing, "productivity_missing"),
+        (~prod_missing & prod_val.notna() & ~prod_val.between(5, 150), "productivity_out_of_range"),
+        (~prod_missing & prod_val.isna(), "productivity_unparsable"),
+        (df["Applicant"].eq("NA"), "applicant_missing"),
+        # Cotton taxonomy sanity: OK to be NA, but helpful to nudge review
+        (crop.eq("Cotton") & df["Taxonomy"].eq("NA"), "cotton_taxonomy_unknown"),
+    ]
 
-    return ",".join(flags) if flags else "OK"
+    flags = pd.Series("", index=df.index)
+    for mask, tag in checks:
+        flags = flags.mask(mask, flags + "," + tag)
+    flags = flags.str.lstrip(",")
+    return flags.mask(flags.eq(""), "OK")
 
 # ------------------------ CLI Debug ------------------------------- #
 
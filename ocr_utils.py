@@ -6,13 +6,19 @@ Part 3/6 of ~3000-line app
 Handles page rendering, preprocessing, and text extraction from PDFs.
 """
 
-import io
 import os
+import re
+import importlib.util
+import sys
+import atexit
+import multiprocessing
 import fitz
+import numpy as np
 import pytesseract
-from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+from PIL import Image, ImageFilter, ImageStat
 import concurrent.futures
-import re
+import functools
+import threading
 from typing import List, Dict, Any, Callable, Tuple
 from tqdm import tqdm
 
@@ -22,24 +28,172 @@ try:
 except ImportError:
     DEFAULTS = None
 
+# Optional: in-process Tesseract (keeps the engine + language data loaded;
+# pytesseract forks the tesseract binary and writes a temp image per page).
+# Imported on first use, not here: libgomp reads OMP_THREAD_LIMIT only when
+# libtesseract loads, so pool workers must set it before the import happens.
+_HAVE_TESSEROCR = importlib.util.find_spec("tesserocr") is not None
+# The two backends don't read every page identically
+OCR_BACKEND = "tesserocr" if _HAVE_TESSEROCR else "pytesseract"
+
+
+# Page text returned in place of a page that failed to OCR; such reads are never cached
+OCR_ERROR_PREFIX = "[OCR ERROR"
+
+# Devanagari block (U+0900–U+097F) mapped to None: str.translate deletes it in one C pass
+_DEVA_TABLE = dict.fromkeys(range(0x0900, 0x0980))
+_RE_DEVA = re.compile(r"[\u0900-\u097F]")
+
+
+def _strip_devanagari(text: str) -> str:
+    """Remove Hindi text; English-only pages (the common case) skip the rebuild."""
+    return text.translate(_DEVA_TABLE) if _RE_DEVA.search(text) else text
+
+
+# ----------------------------------------------------------------------
+# 🧩 Tesseract backend
+# ----------------------------------------------------------------------
+_tess_local = threading.local()
+
+
+def _tess_api(lang: str):
+    """One PyTessBaseAPI per thread and language, created on first use and reused."""
+    apis = getattr(_tess_local, "apis", None)
+    if apis is None:
+        apis = _tess_local.apis = {}
+    if lang not in apis:
+        import tesserocr
+        apis[lang] = tesserocr.PyTessBaseAPI(lang=lang)
+    return apis[lang]
+
+
+def _image_to_string(img: Image.Image, lang: str) -> str:
+    if not _HAVE_TESSEROCR:
+        return pytesseract.image_to_string(img, lang=lang)
+    api = _tess_api(lang)
+    api.SetImage(img)
+    return api.GetUTF8Text()
+
+
+def _mean_confidence(lang: str) -> int | None:
+    """Mean word confidence (0-100) of the last recognised image; None with pytesseract."""
+    if not _HAVE_TESSEROCR:
+        return None  # would need a second image_to_data run
+    return _tess_api(lang).MeanTextConf()
+
+
+def _init_ocr_worker(lang: str, worker_counter=None, release_barrier=None) -> None:
+    """Process-pool initializer: optionally pin the worker to a core and load the Tesseract engine once."""
+    global _worker_release
+    _worker_release = release_barrier
+    # Deliberate oversubscription control: the pool already runs one page per core,
+    # so Tesseract's own OpenMP threads would only fight over the same cores.
+    # Only the worker's environment changes (and the tesseract binaries it spawns);
+    # set before _tess_api below first imports tesserocr/libtesseract.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    if worker_counter is not None and sys.platform == "linux":
+        with worker_counter.get_lock():
+            worker_id = worker_counter.value
+            worker_counter.value += 1
+        cpus = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cpus[worker_id % len(cpus)]})
+    if _HAVE_TESSEROCR:
+        _tess_api(lang)
+
+
+def pool_mp_context():
+    """forkserver where available: workers fork from a small server process instead of
+    copying the (possibly large) parent, and skip spawn's full re-import."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return None  # platform default (spawn on Windows/macOS)
+
 
 # ----------------------------------------------------------------------
 # 🧩 Helper: preprocessing for better OCR results
 # ----------------------------------------------------------------------
+def _contrast_threshold_lut(mean: int, contrast: float, threshold: int) -> np.ndarray:
+    """
+    bool[256] table: grey level -> white after ImageEnhance.Contrast(contrast)
+    and `>= threshold`. Uses the same float32 blend toward `mean` and truncation
+    as PIL, so results are bit-identical.
+    """
+    x = np.arange(256, dtype=np.float32)
+    v = np.float32(mean) + np.float32(contrast) * (x - np.float32(mean))
+    return np.clip(v, 0, 255).astype(np.uint8) >= threshold
+
+
+# Small free-list of page-sized output buffers: at 450 DPI one page is ~20 MB, and
+# handing the same block back each page keeps it out of the allocator hot path.
+_BUFPOOL: List[np.ndarray] = []
+_BUFPOOL_MAX = 2 * (DEFAULTS.THREADS if DEFAULTS else (os.cpu_count() or 2))
+_bufpool_lock = threading.Lock()
+
+
+def _borrow(shape: Tuple[int, int]) -> np.ndarray:
+    with _bufpool_lock:
+        for k, buf in enumerate(_BUFPOOL):
+            if buf.shape == shape:
+                return _BUFPOOL.pop(k)
+    return np.empty(shape, dtype=bool)
+
+
+def _return(buf: np.ndarray) -> None:
+    with _bufpool_lock:
+        if len(_BUFPOOL) >= _BUFPOOL_MAX:
+            _BUFPOOL.pop(0)  # oldest shape out
+        _BUFPOOL.append(buf)
+
+
 def preprocess_image(img: Image.Image, contrast=2.0, threshold=180) -> Image.Image:
     """
-    Convert PDF-rendered page to grayscale, sharpen, enhance contrast, and binarize.
+    Convert PDF-rendered page to grayscale (no-op if already "L"), sharpen, enhance
+    contrast, and binarize.
     """
-    gray = img.convert("L")  # grayscale
+    gray = img if img.mode == "L" else img.convert("L")  # grayscale
     sharp = gray.filter(ImageFilter.SHARPEN)
-    enhanced = ImageEnhance.Contrast(sharp).enhance(contrast)
-    bw = enhanced.point(lambda x: 0 if x < threshold else 255, "1")
-    return bw
+    # Contrast is a per-pixel blend toward the mean grey level, so contrast + threshold
+    # collapse into one 256-entry lookup: a single pass instead of two full images.
+    mean = int(ImageStat.Stat(sharp).mean[0] + 0.5)
+    lut = _contrast_threshold_lut(mean, contrast, threshold)
+    gray_arr = np.asarray(sharp, dtype=np.uint8)
+    bw = _borrow(gray_arr.shape)
+    try:
+        np.take(lut, gray_arr, out=bw)
+        return Image.fromarray(bw)  # bool array -> mode "1" (copies, so bw can be reused)
+    finally:
+        _return(bw)
 
 
 # ----------------------------------------------------------------------
 # 🧩 OCR single page
 # ----------------------------------------------------------------------
+def _render_and_ocr(page, dpi: int, lang: str, contrast: float, threshold: int):
+    """Render one page at `dpi`, preprocess and OCR it. Returns (binarized image, text)."""
+    # render straight to 8-bit grayscale: 1 byte/pixel and no colour conversion later
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    # alias the pixmap's own buffer (samples_mv): no PNG round-trip and no copy
+    mode = {1: "L", 3: "RGB", 4: "RGBA"}[pix.n]
+    raw = Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, "raw", mode, pix.stride, 1)
+    img = preprocess_image(raw, contrast, threshold)
+    del raw, pix  # the view must go before the pixmap that owns the buffer
+    text = _image_to_string(img, lang)
+    text = _strip_devanagari(text)
+    return img, text.strip()
+
+
+_DEBUG_POOL: concurrent.futures.ThreadPoolExecutor | None = None
+
+
+def _debug_pool() -> concurrent.futures.ThreadPoolExecutor:
+    """Single background writer for debug PNGs, started on first use."""
+    global _DEBUG_POOL
+    if _DEBUG_POOL is None:
+        _DEBUG_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="debug-png")
+        atexit.register(_DEBUG_POOL.shutdown, wait=True)
+    return _DEBUG_POOL
+
+
 def ocr_page(
     page,
     dpi: int = 450,
@@ -47,68 +201,201 @@ def ocr_page(
     contrast: float = 2.0,
     threshold: int = 180,
     debug_dir: str | None = None,
+    dpi_low: int | None = None,
+    min_chars: int = 150,
+    min_conf: int = 60,
+    stats: Dict[str, int] | None = None,
 ) -> str:
     """
     Perform OCR on a single PyMuPDF page.
+    With `dpi_low`, the page is first read at that resolution and only re-rendered
+    at `dpi` when the text is shorter than `min_chars` or Tesseract's mean
+    confidence is below `min_conf`; `stats["dpi_escalations"]` counts the retries.
     Returns the recognized English text.
     """
     try:
-        pix = page.get_pixmap(dpi=dpi)
-        img = Image.open(io.BytesIO(pix.tobytes("png")))
-        img = preprocess_image(img, contrast, threshold)
+        img = text = None
+        if dpi_low and dpi_low < dpi:
+            img, text = _render_and_ocr(page, dpi_low, lang, contrast, threshold)
+            conf = _mean_confidence(lang)
+            if len(text) < min_chars or (conf is not None and conf < min_conf):
+                img = text = None  # drop the low-res pass before rendering the large one
+                if stats is not None:
+                    stats["dpi_escalations"] = stats.get("dpi_escalations", 0) + 1
+        if text is None:
+            img, text = _render_and_ocr(page, dpi, lang, contrast, threshold)
 
         if debug_dir:
             os.makedirs(debug_dir, exist_ok=True)
             debug_path = os.path.join(debug_dir, f"page_{page.number+1}.png")
-            img.save(debug_path)
+            # off the OCR path; the binarized image is never modified after this point
+            _debug_pool().submit(img.save, debug_path, optimize=False, compress_level=1)
 
-        text = pytesseract.image_to_string(img, lang=lang)
-        text = re.sub(r"[\u0900-\u097F]+", "", text)  # remove Hindi text
-        return text.strip()
+        return text
     except Exception as e:
-        return f"[OCR ERROR: {e}]"
+        return f"{OCR_ERROR_PREFIX}: {e}]"
 
 
 # ----------------------------------------------------------------------
 # 🧩 OCR multiple pages (parallelized)
 # ----------------------------------------------------------------------
+_worker_doc: Tuple[str, Any] | None = None  # (path, fitz.Document) open in this worker
+_worker_release = None  # Barrier shared by the workers of an ocr_pool()
+RELEASE_TIMEOUT = 30  # seconds a released worker waits for the rest of the pool
+
+
+def _ocr_one_page(
+    pdf_path: str,
+    page_index: int,
+    dpi: int,
+    lang: str,
+    contrast: float,
+    threshold: int,
+    debug_dir: str | None,
+    dpi_low: int | None = None,
+    min_chars: int = 150,
+    min_conf: int = 60,
+) -> Tuple[str, int]:
+    """
+    Process-pool task: OCR one page. fitz documents can't be pickled, so each
+    worker opens the PDF itself and keeps it open for the pages it is handed.
+    Returns (text, number of DPI escalations).
+    """
+    global _worker_doc
+    try:
+        # a long-lived pool may later see a new file under a recycled temp name;
+        # a stale handle is closed here so the deleted file's space is released
+        st = os.stat(pdf_path)
+        ident = (pdf_path, st.st_ino, st.st_mtime_ns)
+        if _worker_doc is None or _worker_doc[0] != ident:
+            if _worker_doc is not None:
+                _worker_doc[1].close()
+            _worker_doc = (ident, fitz.open(pdf_path))
+        stats: Dict[str, int] = {}
+        text = ocr_page(_worker_doc[1][page_index], dpi, lang, contrast, threshold, debug_dir,
+                        dpi_low, min_chars, min_conf, stats)
+        return text, stats.get("dpi_escalations", 0)
+    except Exception as e:
+        return f"{OCR_ERROR_PREFIX}: {e}]", 0
+
+
+def _release_worker_doc() -> None:
+    """
+    Process-pool task: close the PDF this worker holds open. It then waits for the
+    pool's other workers to do the same, so a batch of max_workers of these tasks
+    reaches every worker exactly once.
+    """
+    global _worker_doc
+    if _worker_doc is not None:
+        _worker_doc[1].close()
+        _worker_doc = None
+    if _worker_release is not None:
+        try:
+            _worker_release.wait(timeout=RELEASE_TIMEOUT)
+        except threading.BrokenBarrierError:
+            _worker_release.reset()
+
+
+def release_worker_docs(executor: concurrent.futures.ProcessPoolExecutor, n_workers: int) -> None:
+    """
+    Close the PDFs held open by the workers of a long-lived ocr_pool(), so the
+    caller can delete the file (Windows refuses while a worker has it open, and
+    elsewhere its space isn't released). Blocks until every worker has done so.
+    """
+    try:
+        futures = [executor.submit(_release_worker_doc) for _ in range(n_workers)]
+    except concurrent.futures.BrokenExecutor:
+        return  # dead workers hold nothing open
+    concurrent.futures.wait(futures)
+
+
+def ocr_pool(cfg, pin_cores: bool = False) -> concurrent.futures.ProcessPoolExecutor:
+    """
+    OCR worker pool for cfg.THREADS/cfg.LANG. ocr_document and hybrid_extract_text
+    create one per call; callers that process many files can create it once and
+    pass it as `executor` (they own it and shut it down). Workers keep the PDF
+    they are reading open between pages; release_worker_docs() closes them.
+
+    pin_cores pins worker i to usable core i. Only do this for a single
+    process-wide pool: every pinned pool starts counting at core 0, so
+    concurrent ones would pile onto the same cores.
+    """
+    ctx = pool_mp_context()
+    # Hands each worker its core index.
+    worker_counter = (ctx or multiprocessing).Value("i", 0) if pin_cores else None
+    release_barrier = (ctx or multiprocessing).Barrier(cfg.THREADS or 1)  # see release_worker_docs
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=cfg.THREADS or 1,
+        mp_context=ctx,
+        initializer=_init_ocr_worker,
+        initargs=(cfg.LANG, worker_counter, release_barrier),
+    )
+
+
+def _ocr_task(pdf_path: str, cfg, debug_dir: str | None) -> Callable[[int], Tuple[str, int]]:
+    """_ocr_one_page with the file and OCR settings bound; takes a page index."""
+    return functools.partial(
+        _ocr_one_page, pdf_path,
+        dpi=cfg.DPI, lang=cfg.LANG, contrast=cfg.CONTRAST, threshold=cfg.BIN_THRESHOLD,
+        debug_dir=debug_dir, dpi_low=cfg.DPI_LOW, min_chars=cfg.MIN_ACCEPT_CHARS,
+        min_conf=cfg.MIN_ACCEPT_CONF,
+    )
+
+
 def ocr_document(
     pdf_path: str,
     cfg=None,
     progress_cb: Callable[[float, Dict[str, Any]], None] | None = None,
     cancel_cb: Callable[[], bool] | None = None,
+    doc=None,
+    executor: concurrent.futures.ProcessPoolExecutor | None = None,
 ) -> List[str]:
     """
     Perform OCR for all or selected pages of a PDF.
-    Uses ThreadPoolExecutor for speed.
+    Pages are spread over a ProcessPoolExecutor so rendering, preprocessing and
+    Tesseract run on separate cores. An already open `doc` is only used for the
+    page count (fitz documents can't cross processes; workers open their own).
+    A caller-owned `executor` from ocr_pool() is used instead of a new pool; its
+    workers close the PDF again before this returns.
     Returns a list of text (one per page).
     """
     cfg = cfg or DEFAULTS
-    doc = fitz.open(pdf_path)
-    total_pages = len(doc)
+    if doc is not None:
+        total_pages = doc.page_count
+    else:
+        with fitz.open(pdf_path) as doc:
+            total_pages = doc.page_count
 
     pages = range(total_pages) if cfg.MAX_PAGES is None else range(min(cfg.MAX_PAGES, total_pages))
-    texts: List[str] = [""] * len(pages)
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=cfg.THREADS) as executor:
-        future_to_i = {
-            executor.submit(ocr_page, doc[i], cfg.DPI, cfg.LANG, cfg.CONTRAST, cfg.BIN_THRESHOLD,
-                            os.path.join("debug_pages") if cfg.DEBUG_OCR_TEXT else None): i
-            for i in pages
-        }
+    n_pages = len(pages)
+    texts: List[str] = [""] * n_pages
+    debug_dir = os.path.join("debug_pages") if cfg.DEBUG_OCR_TEXT else None
 
-        for count, future in enumerate(concurrent.futures.as_completed(future_to_i), start=1):
+    own_pool = executor is None
+    if own_pool:
+        executor = ocr_pool(cfg)
+    ocr_one = _ocr_task(pdf_path, cfg, debug_dir)
+    # results come back in page order, a few pages per round-trip
+    chunksize = max(1, n_pages // ((cfg.THREADS or 1) * 4))
+    dpi_escalations = 0
+    results = executor.map(ocr_one, pages, chunksize=chunksize)
+    try:
+        for i, (text, escalated) in enumerate(results):
+            texts[i] = text
+            dpi_escalations += escalated
+            if progress_cb:
+                progress_cb((i + 1) / n_pages, {
+                    "page": i + 1, "stage": "ocr", "dpi_escalations": dpi_escalations,
+                })
             if cancel_cb and cancel_cb():
                 break
-            i = future_to_i[future]
-            try:
-                texts[i] = future.result()
-            except Exception as e:
-                texts[i] = f"[ERROR: {e}]"
-            if progress_cb:
-                progress_cb(count / len(pages), {"page": i + 1, "stage": "ocr"})
+    finally:
+        if own_pool:
+            executor.shutdown(cancel_futures=True)
+        else:
+            results.close()  # cancels this document's pages still queued in the shared pool
+            release_worker_docs(executor, cfg.THREADS or 1)
 
-    doc.close()
     return texts
 
 
@@ -120,30 +407,93 @@ def hybrid_extract_text(
     cfg=None,
     progress_cb: Callable[[float, Dict[str, Any]], None] | None = None,
     cancel_cb: Callable[[], bool] | None = None,
+    doc=None,
+    executor: concurrent.futures.ProcessPoolExecutor | None = None,
 ) -> List[str]:
     """
     Try text extraction first, then fallback to OCR if text is missing or too short.
+    Pages that need OCR are handed to the process pool as soon as they are found,
+    so Tesseract runs while the remaining pages are still being read.
+    Pass an already open fitz `doc` to skip re-parsing the PDF; it is left open.
+    Pass an `executor` from ocr_pool() to reuse warm workers; it is left running,
+    with the PDF closed again in its workers.
     """
     cfg = cfg or DEFAULTS
-    doc = fitz.open(pdf_path)
+    own_doc = doc is None
+    if own_doc:
+        doc = fitz.open(pdf_path)
     total_pages = len(doc)
-    texts = []
+    texts: List[str] = []
+    ocr_pages_used = digital_pages_used = dpi_escalations = done = 0
+    ocr_stats: Dict[str, int] = {}
+    # workers reopen the file by path, so a document opened from a stream stays in-process
+    src_path = pdf_path or doc.name
+    use_pool = (executor is not None or (cfg.THREADS or 1) > 1) and bool(src_path) and os.path.isfile(src_path)
+    own_pool = executor is None
+    ocr_one = _ocr_task(src_path, cfg, None) if use_pool else None
+    future_to_i: Dict[concurrent.futures.Future, int] = {}
 
-    for i in tqdm(range(total_pages), desc="Reading pages"):
-        if cancel_cb and cancel_cb():
-            break
+    def report(i: int, stage: str) -> None:
+        # refresh=False: let tqdm's mininterval throttle terminal writes instead of one per page
+        bar.set_postfix(digital=digital_pages_used, ocr=ocr_pages_used, hi_dpi=dpi_escalations,
+                        refresh=False)
+        if progress_cb:
+            progress_cb(done / total_pages, {
+                "page": i + 1,
+                "stage": stage,
+                "digital_pages": digital_pages_used,
+                "ocr_pages": ocr_pages_used,
+                "dpi_escalations": dpi_escalations,
+            })
 
-        page = doc[i]
-        text = page.get_text("text").strip()
-        text = re.sub(r"[\u0900-\u097F]+", "", text)
-        if len(text) < 150:  # too short → fallback to OCR
-            text = ocr_page(page, cfg.DPI, cfg.LANG, cfg.CONTRAST, cfg.BIN_THRESHOLD)
-        texts.append(text)
+    bar = tqdm(total=total_pages, desc="Reading pages")
+    try:
+        for i in range(total_pages):
+            if cancel_cb and cancel_cb():
+                break
 
-        if progress_cb:
-            progress_cb((i + 1) / total_pages, {"page": i + 1, "stage": "read"})
+            page = doc[i]
+            text = page.get_text("text").strip()
+            text = _strip_devanagari(text)  # before the length test: Hindi doesn't count
+            if len(text) < 150:  # too short → fallback to OCR
+                ocr_pages_used += 1
+                if use_pool:
+                    if executor is None:
+                        executor = ocr_pool(cfg)
+                    future_to_i[executor.submit(ocr_one, i)] = i
+                    texts.append("")  # filled in when the worker returns
+                    continue
+                text = ocr_page(page, cfg.DPI, cfg.LANG, cfg.CONTRAST, cfg.BIN_THRESHOLD,
+                                dpi_low=cfg.DPI_LOW, min_chars=cfg.MIN_ACCEPT_CHARS,
+                                min_conf=cfg.MIN_ACCEPT_CONF, stats=ocr_stats)
+                dpi_escalations = ocr_stats.get("dpi_escalations", 0)
+            else:
+                digital_pages_used += 1
+            texts.append(text)
+            done += 1
+            bar.update()
+            report(i, "read")
 
-    doc.close()
+        for future in concurrent.futures.as_completed(future_to_i):
+            if cancel_cb and cancel_cb():
+                break
+            i = future_to_i[future]
+            texts[i], escalated = future.result()
+            dpi_escalations += escalated
+            done += 1
+            bar.update()
+            report(i, "ocr")
+    finally:
+        bar.close()
+        if own_pool and executor is not None:
+            executor.shutdown(cancel_futures=True)
+        else:
+            for future in future_to_i:
+                future.cancel()
+            if future_to_i:
+                release_worker_docs(executor, cfg.THREADS or 1)
+        if own_doc:
+            doc.close()
     return texts
 
 
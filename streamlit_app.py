@@ -1,17 +1,35 @@
 import streamlit as st
 import io
 import pandas as pd
+import numpy as np
 import os
+import hashlib
+import re
+import secrets
+import importlib.machinery
+from collections import OrderedDict
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 import tempfile
+import pickle
+import time
+import threading
 import shutil
-from typing import List, Dict, Any
+from typing import Dict, Any
 import plotly.express as px
-import plotly.graph_objects as go
+
+# Worker processes started with spawn/forkserver re-run the main script by path unless
+# it has a module spec. Every pool task lives in extractor/ocr_utils, so give this
+# script a "__main__" spec and the workers skip re-running the whole app.
+if __spec__ is None:
+    __spec__ = importlib.machinery.ModuleSpec("__main__", None)
 
 # Internal modules
 import extractor
 import excel_writer
-from config import DEFAULTS, Config
+import ocr_utils
+from config import DEFAULTS, Config, CACHE_DIR
 
 # Page Config
 st.set_page_config(
@@ -31,9 +49,98 @@ try:
 except FileNotFoundError:
     pass # Fallback if css not found
 
+# --- Extraction Results ---
+@dataclasses.dataclass(frozen=True, slots=True)
+class Result:
+    """One file's extraction as kept in session_state; replaced whole, never edited in place."""
+    df: pd.DataFrame
+    summaries: Dict[str, pd.DataFrame]
+    version: int  # results_version when stored; keys the combined-frame memo
+    digest: str = ""  # upload_digest of the source PDF
+    processed: bool = True
+
+# --- Result Persistence ---
+# Finished extractions are pickled under cache/results/<sid>/ so a browser reload
+# or server restart doesn't lose them. <sid> is a random id kept in the page URL,
+# so each visitor only ever sees (and clears) their own results; folders untouched
+# for RESULTS_MAX_AGE_DAYS are deleted.
+RESULTS_DIR = os.path.join(CACHE_DIR, "results")
+RESULTS_MAX_AGE_DAYS = 7
+_RE_RESULTS_SID = re.compile(r"[A-Za-z0-9_-]{22}")
+
+def _results_session_id() -> str:
+    sid = st.query_params.get("sid")
+    if not sid or not _RE_RESULTS_SID.fullmatch(sid):
+        sid = secrets.token_urlsafe(16)
+        st.query_params["sid"] = sid
+    return sid
+
+def _results_dir() -> str:
+    return os.path.join(RESULTS_DIR, st.session_state.results_sid)
+
+def _result_path(filename: str, digest: str) -> str:
+    name_key = hashlib.blake2b(f"{digest}\0{filename}".encode(), digest_size=16).hexdigest()
+    return os.path.join(_results_dir(), name_key + ".pkl")
+
+def persist_result(filename: str, result: Result) -> None:
+    path = _result_path(filename, result.digest)
+    tmp = f"{path}.tmp"
+    try:
+        os.makedirs(_results_dir(), exist_ok=True)
+        with open(tmp, "wb") as f:
+            pickle.dump((filename, result.digest, result.df, result.summaries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # persistence is best-effort
+
+def _prune_persisted_results() -> None:
+    cutoff = time.time() - RESULTS_MAX_AGE_DAYS * 86400
+    try:
+        entries = list(os.scandir(RESULTS_DIR))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path)
+        except OSError:
+            pass
+
+def load_persisted_results() -> Dict[str, Result]:
+    """This session's stored results, oldest first, numbered with versions 1..n."""
+    _prune_persisted_results()
+    try:
+        paths = [e.path for e in os.scandir(_results_dir()) if e.name.endswith(".pkl")]
+    except OSError:
+        return {}
+    results: Dict[str, Result] = {}
+    for path in sorted(paths, key=os.path.getmtime):
+        try:
+            with open(path, "rb") as f:
+                filename, digest, df, summaries = pickle.load(f)
+        except Exception:
+            # half-written, or pickled by another pandas/app version: it would fail
+            # the same way on every load, so drop it
+            _remove_quietly(path)
+            continue
+        results[filename] = Result(df, summaries, version=len(results) + 1, digest=digest)
+    try:
+        os.utime(_results_dir())  # a returning visitor keeps their folder past the age cap
+    except OSError:
+        pass
+    return results
+
+def clear_persisted_results() -> None:
+    shutil.rmtree(_results_dir(), ignore_errors=True)
+
 # --- Session State Initialization ---
+if "results_sid" not in st.session_state:
+    st.session_state.results_sid = _results_session_id()
 if "extraction_results" not in st.session_state:
-    st.session_state.extraction_results = {}
+    st.session_state.extraction_results = load_persisted_results()
+if "results_version" not in st.session_state:
+    # bumped whenever a result df is stored
+    st.session_state.results_version = len(st.session_state.extraction_results)
 if "custom_config" not in st.session_state:
     st.session_state.custom_config = {
         "contrast": 2.0,
@@ -43,43 +150,351 @@ if "custom_config" not in st.session_state:
     }
 
 # --- Helper Functions ---
-def process_file(uploaded_file, cfg: Config):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(uploaded_file.getvalue())
-        tmp_path = tmp.name
+def upload_digest(uploaded_file) -> str:
+    """
+    Content hash of an upload; hashes the in-memory buffer without copying it.
+    Same digest as extractor.file_digest of the saved file.
+    """
+    with uploaded_file.getbuffer() as view:
+        return hashlib.blake2b(view, digest_size=16).hexdigest()
+
+@st.cache_resource
+def _extraction_cache() -> "OrderedDict[tuple, tuple]":
+    """Process-wide LRU of (df, summaries) keyed on (upload digest, settings)."""
+    return OrderedDict()
 
+@st.cache_resource
+def _extraction_cache_lock() -> threading.Lock:
+    # every session thread shares the LRU; a module-level lock would be recreated per rerun
+    return threading.Lock()
+
+EXTRACTION_CACHE_SIZE = 32
+UPLOAD_COPY_BUFSIZE = 4 * 1024 * 1024
+UPLOAD_RAM_DIR = "/dev/shm"  # tmpfs on Linux; skipped where it doesn't exist
+UPLOAD_RAM_MAX_BYTES = 64 * 1024 * 1024
+PROGRESS_MIN_INTERVAL = 0.1  # seconds between progress widget updates
+
+def _copy_upload(uploaded_file, tmp_dir: str | None) -> str:
+    uploaded_file.seek(0)
     try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf", dir=tmp_dir, buffering=UPLOAD_COPY_BUFSIZE) as tmp:
+            try:
+                shutil.copyfileobj(uploaded_file, tmp, length=UPLOAD_COPY_BUFSIZE)
+            except OSError:
+                tmp.close()
+                _remove_quietly(tmp.name)
+                raise
+            return tmp.name
+    finally:
+        uploaded_file.seek(0)
+
+def _save_upload(uploaded_file, in_ram: bool = True) -> str:
+    """
+    Write an upload to a temp .pdf and return its path (caller removes it). OCR
+    workers reopen the file by path, so it can't stay a purely in-memory stream;
+    with in_ram, uploads up to UPLOAD_RAM_MAX_BYTES go to the RAM-backed /dev/shm
+    instead of disk.
+    """
+    # stream the upload in 4 MiB chunks instead of copying it into one bytes object
+    if in_ram and uploaded_file.size <= UPLOAD_RAM_MAX_BYTES and os.path.isdir(UPLOAD_RAM_DIR):
+        try:
+            return _copy_upload(uploaded_file, UPLOAD_RAM_DIR)
+        except OSError:
+            pass  # tmpfs full or not writable: fall back to the regular temp dir
+    return _copy_upload(uploaded_file, None)
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+@st.cache_resource
+def get_config(dpi: int, contrast: float, threshold: int) -> Config:
+    """Extraction settings for the Settings-page values, built once per process and shared (don't mutate)."""
+    return Config(
+        DPI=dpi,
+        CONTRAST=contrast,
+        BIN_THRESHOLD=threshold,
+        LANG="eng",
+        TARGET_CROPS=DEFAULTS.TARGET_CROPS,
+        MAX_PAGES=None,
+        ALLOW_HINDI=False,
+        THREADS=DEFAULTS.THREADS,
+        SAVE_INTERMEDIATE_IMAGES=False,
+        DEBUG_OCR_TEXT=False,
+        FIELD_PATTERNS=DEFAULTS.FIELD_PATTERNS,
+    )
+
+@st.cache_resource
+def get_ocr_pool(threads: int, lang: str) -> ProcessPoolExecutor:
+    """OCR/parse worker pool kept warm across files, reruns and sessions."""
+    return ocr_utils.ocr_pool(
+        dataclasses.replace(DEFAULTS, THREADS=threads, LANG=lang), pin_cores=True
+    )
+
+def _shared_ocr_pool(cfg: Config) -> ProcessPoolExecutor | None:
+    return get_ocr_pool(cfg.THREADS, cfg.LANG) if (cfg.THREADS or 1) > 1 else None
+
+def _extract_upload(uploaded_file, digest: str, cfg: Config, progress_cb,
+                    executor: ProcessPoolExecutor | None):
+    # Warm pool workers keep their last PDF open after it is deleted; on tmpfs that
+    # would hold the whole file in RAM per worker until its next task, so stay on disk.
+    tmp_path = _save_upload(uploaded_file, in_ram=executor is None)
+    try:
+        return extractor.extract_to_dataframe(
+            pdf_path=tmp_path,
+            config=cfg,
+            progress_cb=progress_cb,
+            cancel_cb=lambda: False,
+            executor=executor,
+            content_digest=digest,
+        )
+    except BrokenProcessPool:
+        get_ocr_pool.clear()  # a worker died; start a fresh pool next time
+        raise
+    finally:
+        _remove_quietly(tmp_path)
+
+def _cache_key(digest: str, cfg: Config) -> tuple:
+    # every output-relevant setting is in the key, so changing one extracts afresh
+    return (digest, cfg.output_key())
+
+def _cache_put(key: tuple, result: tuple) -> None:
+    cache = _extraction_cache()
+    with _extraction_cache_lock():
+        cache[key] = result
+        cache.move_to_end(key)
+        while len(cache) > EXTRACTION_CACHE_SIZE:
+            cache.popitem(last=False)
+
+def _cache_get(key: tuple):
+    cache = _extraction_cache()
+    with _extraction_cache_lock():
+        hit = cache.get(key)
+        if hit is not None:
+            cache.move_to_end(key)
+    return hit
+
+def _own_copy(result: tuple) -> tuple:
+    # callers add columns to the frame, so hand out copies of the shared entry
+    df, summaries = result
+    return df.copy(), {name: sdf.copy() for name, sdf in summaries.items()}
+
+def process_file(uploaded_file, digest: str, cfg: Config):
+    # Re-uploading a file already seen with the same settings skips the temp file,
+    # OCR and parsing. (Not st.cache_data: it can't replay the progress widgets
+    # updated during a run.)
+    key = _cache_key(digest, cfg)
+    hit = _cache_get(key)
+    if hit is None:
         progress_bar = st.progress(0)
         status_text = st.empty()
 
+        last_update = [0.0]
+
         def update_progress(frac, detail):
+            # every page reports in; forward at most ~10 updates/s to the browser
+            now = time.monotonic()
+            if frac < 1.0 and now - last_update[0] < PROGRESS_MIN_INTERVAL:
+                return
+            last_update[0] = now
             progress_bar.progress(frac)
             status_text.text(f"Processing {uploaded_file.name}: {detail.get('stage', '')} - Page {detail.get('page', '?')}")
 
-        df, summaries = extractor.extract_to_dataframe(
-            pdf_path=tmp_path,
-            config=cfg,
-            progress_cb=update_progress,
-            cancel_cb=lambda: False
-        )
-        
-        progress_bar.empty()
-        status_text.empty()
-        return df, summaries
-    finally:
         try:
-            os.remove(tmp_path)
-        except:
-            pass
+            hit = _extract_upload(uploaded_file, digest, cfg, update_progress, _shared_ocr_pool(cfg))
+        finally:
+            progress_bar.empty()
+            status_text.empty()
+        _cache_put(key, hit)
+    return _own_copy(hit)
+
+def process_files(uploaded_files, cfg: Config) -> Dict[str, tuple]:
+    """
+    (df, summaries, upload digest) per upload name; each upload is hashed once
+    here. Cached files are returned directly; a single
+    new file runs with per-page progress, several new files are read side by side
+    in threads while all their OCR pages share the one warm get_ocr_pool() pool.
+    Uploads with identical content are extracted once and share the result.
+    """
+    results: Dict[str, tuple] = {}
+    misses = []
+    first_upload: Dict[tuple, str] = {}  # cache key -> first upload name with that content
+    duplicates = []
+    digests: Dict[str, str] = {}
+    for up_file in uploaded_files:
+        digests[up_file.name] = upload_digest(up_file)
+        key = _cache_key(digests[up_file.name], cfg)
+        if key in first_upload:
+            duplicates.append((up_file.name, first_upload[key]))
+            continue
+        first_upload[key] = up_file.name
+        hit = _cache_get(key)
+        if hit is not None:
+            results[up_file.name] = _own_copy(hit)
+        else:
+            misses.append((up_file, key))
+
+    if len(misses) == 1:
+        up_file, _ = misses[0]
+        results[up_file.name] = process_file(up_file, digests[up_file.name], cfg)
+    elif misses:
+        # one pool of cfg.THREADS pinned workers for every file, rather than a pool
+        # per file whose workers would all pin themselves to the same first cores
+        executor = _shared_ocr_pool(cfg)
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        try:
+            with ThreadPoolExecutor(max_workers=min(cfg.THREADS or 1, len(misses))) as file_pool:
+                futures = {
+                    file_pool.submit(_extract_upload, up_file, key[0], cfg, None, executor): (up_file.name, key)
+                    for up_file, key in misses
+                }
+                for done, fut in enumerate(as_completed(futures), start=1):
+                    name, key = futures[fut]
+                    result = fut.result()
+                    _cache_put(key, result)
+                    results[name] = _own_copy(result)
+                    progress_bar.progress(done / len(misses))
+                    status_text.text(f"Processed {name} ({done}/{len(misses)} files)")
+        finally:
+            progress_bar.empty()
+            status_text.empty()
+
+    for name, original in duplicates:
+        results[name] = _own_copy(results[original])
+    return {name: (df, summaries, digests[name]) for name, (df, summaries) in results.items()}
+
+def arrow_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Text columns still held as Python objects (pandas < 3) become Arrow-backed
+    strings, which Streamlit ships to the browser without a per-rerun conversion.
+    Numeric and categorical columns keep their NaN semantics for the charts.
+    A no-op where pandas already infers Arrow strings (pandas 3, or the
+    future.infer_string option).
+    """
+    try:
+        if pd.get_option("future.infer_string"):
+            return df
+    except KeyError:  # option added in pandas 2.1
+        pass
+    text_cols = [col for col, dtype in df.dtypes.items() if dtype == object]
+    if text_cols:
+        df = df.astype({col: "string[pyarrow]" for col in text_cols})
+    return df
+
+def editable_labels(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Categorical columns as plain strings: st.data_editor renders categoricals as
+    selectboxes limited to the existing labels, which would stop users correcting
+    a mis-read crop or type to a new value.
+    """
+    cat_cols = [col for col, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    if cat_cols:
+        df = df.astype({col: "string[pyarrow]" for col in cat_cols})
+    return df
+
+def store_result(filename: str, df: pd.DataFrame, summaries, digest: str) -> None:
+    st.session_state.results_version += 1
+    result = Result(arrow_strings(df), summaries, st.session_state.results_version, digest)
+    previous = st.session_state.extraction_results.get(filename)
+    if previous is not None and previous.digest != digest:
+        _remove_quietly(_result_path(filename, previous.digest))  # same name, new content
+    persist_result(filename, result)
+    st.session_state.extraction_results[filename] = result
 
 def get_combined_dataframe():
+    """
+    All extracted rows in one frame. The concat is redone only when a result was
+    added or replaced, not on every rerun; treat the returned frame as read-only.
+    """
+    key = tuple((name, res.version) for name, res in st.session_state.extraction_results.items())
+    cached = st.session_state.get("_combined_df")
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
     all_dfs = []
     for res in st.session_state.extraction_results.values():
-        if res["df"] is not None and not res["df"].empty:
-            all_dfs.append(res["df"])
-    if all_dfs:
-        return pd.concat(all_dfs, ignore_index=True)
-    return pd.DataFrame()
+        if res.df is not None and not res.df.empty:
+            all_dfs.append(res.df)
+    combined = pd.concat(all_dfs, ignore_index=True) if all_dfs else pd.DataFrame()
+    # concat falls back to object when the files' category sets differ; re-unify them
+    for col in extractor.CATEGORY_COLUMNS:
+        if col in combined.columns and not isinstance(combined[col].dtype, pd.CategoricalDtype):
+            combined[col] = combined[col].astype("category")
+    st.session_state._combined_df = (key, combined)
+    return combined
+
+def memo_on_combined(name: str, build):
+    """Value of build(), kept in session_state until the combined frame changes."""
+    key = st.session_state._combined_df[0]
+    cached = st.session_state.get(name)
+    if cached is None or cached[0] != key:
+        cached = (key, build())
+        st.session_state[name] = cached
+    return cached[1]
+
+def get_search_haystack(df: pd.DataFrame) -> pd.Series:
+    """
+    Lower-cased "Variety_Name \0 Applicant" per row of the combined frame, built once
+    per combined frame so each search keystroke is a single literal substring scan.
+    """
+    return memo_on_combined("_search_haystack", lambda: (
+        df["Variety_Name"].fillna("").astype(str) + "\0" + df["Applicant"].fillna("").astype(str)
+    ).str.lower())
+
+YIELD_BIN_EDGES = np.linspace(0, 200, 21)  # 10 q/ha bins
+EDITOR_PAGE_SIZE = 200  # Data Explorer rows per editor page
+
+def _build_chart_aggregates(df: pd.DataFrame) -> Dict[str, Any]:
+    yields = productivity_values(df)
+    crop_counts = df["Crop"].value_counts().reset_index()
+    crop_counts.columns = ["Crop", "Count"]
+    app_counts = df["Applicant_Type"].value_counts().reset_index()
+    app_counts.columns = ["Type", "Count"]
+
+    # Bin on the server: the chart gets one bar per (bin, crop) instead of every row
+    edges = YIELD_BIN_EDGES
+    hist_parts = []
+    in_range = yields < 200  # NaN compares False
+    for crop, vals in yields[in_range].groupby(df.loc[in_range, "Crop"], observed=True):
+        counts, _ = np.histogram(vals.to_numpy(), bins=edges)
+        hist_parts.append(pd.DataFrame({"Yield_Q_Ha": (edges[:-1] + edges[1:]) / 2, "Crop": crop, "Count": counts}))
+    hist_df = pd.concat(hist_parts, ignore_index=True) if hist_parts else pd.DataFrame(columns=["Yield_Q_Ha", "Crop", "Count"])
+
+    return {
+        "n_crops": df["Crop"].nunique(),
+        "n_applicants": df["Applicant"].nunique(),
+        "avg_yield": yields.mean(),
+        "crop_counts": crop_counts,
+        "app_counts": app_counts,
+        "yield_hist": hist_df[hist_df["Count"] > 0],
+    }
+
+def get_chart_aggregates(df: pd.DataFrame) -> Dict[str, Any]:
+    """Analytics metrics and chart tables, computed once per combined frame."""
+    return memo_on_combined("_chart_aggregates", lambda: _build_chart_aggregates(df))
+
+def productivity_values(df: pd.DataFrame) -> pd.Series:
+    """Productivity in q/ha as floats; the extractor already parsed it per file."""
+    if "Productivity_Value" in df.columns:
+        return df["Productivity_Value"]
+    return pd.to_numeric(df["Productivity"].astype(str).str.extract(r"([\d.]+)", expand=False), errors="coerce")
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Content hash of a frame (values, index and column names)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(list(df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_xlsx_bytes(df_digest: str, _df: pd.DataFrame, data_sheet: str = "Data") -> bytes:
+    """Workbook bytes for a frame; rebuilt only when df_digest changes (_df is not hashed)."""
+    buffer = io.BytesIO()
+    excel_writer.write_full_workbook(_df, {}, buffer, data_sheet=data_sheet)
+    return buffer.getvalue()
 
 # --- Sidebar Navigation ---
 with st.sidebar:
@@ -96,6 +511,10 @@ with st.sidebar:
     st.caption("Project Status")
     if st.session_state.extraction_results:
         st.success(f"{len(st.session_state.extraction_results)} Files Processed")
+        if st.button("🗑️ Clear Results", use_container_width=True):
+            clear_persisted_results()
+            st.session_state.extraction_results = {}
+            st.rerun()
     else:
         st.info("Ready to extract")
 
@@ -141,45 +560,40 @@ elif selected_page == "Extractor":
             start_btn = st.button(f"🚀 Start Extraction", use_container_width=True)
         
         if start_btn:
-            cfg = Config(
-                DPI=defaults["dpi"],
-                CONTRAST=defaults["contrast"],
-                BIN_THRESHOLD=defaults["threshold"],
-                LANG="eng",
-                TARGET_CROPS=DEFAULTS.TARGET_CROPS,
-                MAX_PAGES=None,
-                ALLOW_HINDI=False,
-                THREADS=DEFAULTS.THREADS,
-                SAVE_INTERMEDIATE_IMAGES=False,
-                DEBUG_OCR_TEXT=False,
-                FIELD_PATTERNS=DEFAULTS.FIELD_PATTERNS,
-            )
+            cfg = get_config(defaults["dpi"], defaults["contrast"], defaults["threshold"])
 
+            out_dir = defaults.get("output_dir", "")
+            save_tasks = []  # (upload name, xlsx name, df) written after the batch
+            with st.spinner(f"Processing {len(uploaded_files)} file(s)..."):
+                batch_results = process_files(uploaded_files, cfg)
             for up_file in uploaded_files:
-                with st.spinner(f"Processing {up_file.name}..."):
-                    df, summaries = process_file(up_file, cfg)
-                    # Add source filename to dataframe
-                    if not df.empty:
-                        df["Source_File"] = up_file.name
-                        
-                    st.session_state.extraction_results[up_file.name] = {
-                        "df": df,
-                        "summaries": summaries,
-                        "processed": True
-                    }
-                    
-                    # Save individual file to server if output_dir is set
-                    out_dir = defaults.get("output_dir", "")
-                    if out_dir and not df.empty:
+                df, summaries, digest = batch_results[up_file.name]
+                # Add source filename to dataframe
+                if not df.empty:
+                    df["Source_File"] = up_file.name
+
+                store_result(up_file.name, df, summaries, digest)
+
+                # Queue the per-file server copy if output_dir is set
+                if out_dir and not df.empty:
+                    save_name = f"{os.path.splitext(up_file.name)[0]}.xlsx"
+                    save_tasks.append((up_file.name, save_name, df))
+
+            # Save individual files to server, overlapping their disk/network I/O.
+            # write_full_workbook creates the folder if needed and streams
+            # rows with xlsxwriter (constant_memory mode).
+            if save_tasks:
+                with ThreadPoolExecutor(max_workers=4) as save_pool:
+                    pending = [
+                        (name, save_name, save_pool.submit(excel_writer.write_full_workbook, df, {}, os.path.join(out_dir, save_name)))
+                        for name, save_name, df in save_tasks
+                    ]
+                    for name, save_name, fut in pending:
                         try:
-                            os.makedirs(out_dir, exist_ok=True)
-                            base_name = os.path.splitext(up_file.name)[0]
-                            save_name = f"{base_name}.xlsx"
-                            saved_path = os.path.join(out_dir, save_name)
-                            df.to_excel(saved_path, index=False)
+                            fut.result()
                             st.toast(f"Saved {save_name} to server", icon="✅")
                         except Exception as e:
-                            st.error(f"Failed to save {up_file.name} to server: {e}")
+                            st.error(f"Failed to save {name} to server: {e}")
             # Combine results
             final_df = get_combined_dataframe()
             
@@ -194,9 +608,9 @@ elif selected_page == "Extractor":
 
                 # Provide Download Button
                 with io.BytesIO() as buffer:
-                    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                        final_df.to_excel(writer, index=False, sheet_name='Extracted Data')
-                    
+                    # row-streamed xlsxwriter (constant_memory) instead of a full in-memory workbook
+                    excel_writer.write_full_workbook(final_df, {}, buffer, data_sheet="Extracted Data")
+
                     st.download_button(
                         label=f"⬇️ Download Results",
                         data=buffer.getvalue(),
@@ -212,9 +626,16 @@ elif selected_page == "Extractor":
     if st.session_state.extraction_results:
         st.divider()
         st.subheader("Recent Extractions")
-        for filename, res in st.session_state.extraction_results.items():
-            with st.expander(f"📄 {filename} ({len(res['df'])} varieties)"):
-                st.dataframe(res['df'].head(5), use_container_width=True)
+        # only the picked file's preview is sent to the browser, not one table per file
+        results = st.session_state.extraction_results
+        preview_file = st.radio(
+            "Preview file",
+            list(results),
+            format_func=lambda name: f"📄 {name} ({len(results[name].df)} varieties)",
+            horizontal=True,
+            label_visibility="collapsed",
+        )
+        st.dataframe(results[preview_file].df.head(5), use_container_width=True)
 
 # --- 📊 Analytics Page ---
 elif selected_page == "Analytics":
@@ -225,12 +646,15 @@ elif selected_page == "Analytics":
     if df.empty:
         st.warning("No data available. Please extract some files first.")
     else:
+        agg = get_chart_aggregates(df)
+
         # Top Metrics
         m1, m2, m3, m4 = st.columns(4)
         m1.metric("Total Varieties", len(df))
-        m2.metric("Unique Crops", df["Crop"].nunique())
-        m3.metric("Applicants", df["Applicant"].nunique())
-        m4.metric("Avg Productivity", f"{df['Productivity'].str.extract(r'(\d+)').astype(float).mean().iloc[0]:.1f} q/ha" if not df.empty else "N/A")
+        m2.metric("Unique Crops", agg["n_crops"])
+        m3.metric("Applicants", agg["n_applicants"])
+        avg_yield = agg["avg_yield"]
+        m4.metric("Avg Productivity", f"{avg_yield:.1f} q/ha" if pd.notna(avg_yield) else "N/A")
         
         st.markdown("---")
         
@@ -239,34 +663,21 @@ elif selected_page == "Analytics":
         
         with c1:
             st.subheader("Crop Distribution")
-            crop_counts = df["Crop"].value_counts().reset_index()
-            crop_counts.columns = ["Crop", "Count"]
-            fig_crop = px.pie(crop_counts, values='Count', names='Crop', hole=0.4, color_discrete_sequence=px.colors.sequential.Teal)
+            fig_crop = px.pie(agg["crop_counts"], values='Count', names='Crop', hole=0.4, color_discrete_sequence=px.colors.sequential.Teal)
             st.plotly_chart(fig_crop, use_container_width=True)
             
         with c2:
             st.subheader("Applicant Types")
-            app_counts = df["Applicant_Type"].value_counts().reset_index()
-            app_counts.columns = ["Type", "Count"]
-            fig_app = px.bar(app_counts, x='Type', y='Count', color='Type', color_discrete_sequence=px.colors.qualitative.Prism)
+            fig_app = px.bar(agg["app_counts"], x='Type', y='Count', color='Type', color_discrete_sequence=px.colors.qualitative.Prism)
             st.plotly_chart(fig_app, use_container_width=True)
         
         st.subheader("Productivity Analysis")
         
-        # Parse productivity for chart
-        def parse_prod(x):
-            try:
-                val = str(x).lower().replace("q/ha", "").strip()
-                return float(val)
-            except:
-                return None
-        
-        df["Yield_Q_Ha"] = df["Productivity"].apply(parse_prod)
-        valid_yields = df.dropna(subset=["Yield_Q_Ha"])
-        valid_yields = valid_yields[valid_yields["Yield_Q_Ha"] < 200]
-        
-        if not valid_yields.empty:
-            fig_hist = px.histogram(valid_yields, x="Yield_Q_Ha", color="Crop", nbins=20, title="Yield Distribution (q/ha)", color_discrete_sequence=px.colors.sequential.Viridis)
+        hist_df = agg["yield_hist"]
+        if not hist_df.empty:
+            fig_hist = px.bar(hist_df, x="Yield_Q_Ha", y="Count", color="Crop", title="Yield Distribution (q/ha)", color_discrete_sequence=px.colors.sequential.Viridis)
+            # bars span their bin even when neighbours are empty
+            fig_hist.update_traces(width=YIELD_BIN_EDGES[1] - YIELD_BIN_EDGES[0])
             st.plotly_chart(fig_hist, use_container_width=True)
         else:
             st.info("Insufficient productivity data for visualization.")
@@ -283,43 +694,71 @@ elif selected_page == "Data Explorer":
         # Filters
         c1, c2, c3 = st.columns(3)
         with c1:
-            crops = ["All"] + list(df["Crop"].unique())
+            crops = ["All"] + list(df["Crop"].cat.categories)
             sel_crop = st.selectbox("Filter by Crop", crops)
         with c2:
-            types = ["All"] + list(df["Applicant_Type"].unique())
+            types = ["All"] + list(df["Applicant_Type"].cat.categories)
             sel_type = st.selectbox("Filter by Applicant Type", types)
         with c3:
             search = st.text_input("Search Variety or Applicant", "")
             
-        # Apply filters
-        filtered_df = df.copy()
+        # Apply filters (one combined mask, one row selection)
+        mask = pd.Series(True, index=df.index)
         if sel_crop != "All":
-            filtered_df = filtered_df[filtered_df["Crop"] == sel_crop]
+            mask &= df["Crop"] == sel_crop
         if sel_type != "All":
-            filtered_df = filtered_df[filtered_df["Applicant_Type"] == sel_type]
+            mask &= df["Applicant_Type"] == sel_type
         if search:
-            filtered_df = filtered_df[
-                filtered_df["Variety_Name"].str.contains(search, case=False, na=False) | 
-                filtered_df["Applicant"].str.contains(search, case=False, na=False)
-            ]
+            mask &= get_search_haystack(df).str.contains(search.lower(), regex=False)
+        filtered_df = df[mask]
             
         st.markdown(f"**Showing {len(filtered_df)} varieties**")
         
-        # Editable Dataframe
-        edited_df = st.data_editor(
-            filtered_df,
+        # Editable Dataframe, one page at a time: only the visible rows go to the browser
+        n_pages = max(1, -(-len(filtered_df) // EDITOR_PAGE_SIZE))
+        page = st.number_input("Page", 1, n_pages, 1) if n_pages > 1 else 1
+        page_rows = lambda p: filtered_df.iloc[(p - 1) * EDITOR_PAGE_SIZE:p * EDITOR_PAGE_SIZE]
+
+        # Edits of pages the user has left are kept here until the data or filters change.
+        # A page's editor starts from its kept edits under a fresh key, so Streamlit
+        # doesn't replay its own widget deltas on top of them.
+        scope = (st.session_state._combined_df[0], sel_crop, sel_type, search)
+        edits = st.session_state.get("_explorer_edits")
+        if edits is None or edits["scope"] != scope:
+            gen = edits["gen"] + 1 if edits else 0
+            edits = {"scope": scope, "pages": {}, "page": page, "last": None, "gen": gen}
+            st.session_state._explorer_edits = edits
+        elif edits["page"] != page:
+            if edits["last"] is not None:
+                edits["pages"][edits["page"]] = edits["last"]
+            edits["page"], edits["gen"] = page, edits["gen"] + 1
+
+        editor_key = f"data_explorer_editor_{edits['gen']}"
+        edited_page = st.data_editor(
+            edits["pages"].get(page, editable_labels(page_rows(page))),
             num_rows="dynamic",
             use_container_width=True,
-            key="data_explorer_editor"
+            key=editor_key
         )
-        
-        # Export
-        if st.button("💾 Export Filtered Data to Excel"):
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as tmp_xls:
-                # Simple export for now, or use excel_writer if needed
-                edited_df.to_excel(tmp_xls.name, index=False)
-                tmp_xls_path = tmp_xls.name
-            
+        edits["last"] = edited_page
+
+        # Export: the workbook is only built when asked for, and the prepared file is
+        # kept until the data, filters or edits change (the editor's own widget state
+        # covers the visible page; kept pages only change along with gen).
+        export_state = (scope, edits["gen"], repr(st.session_state.get(editor_key)))
+        export = st.session_state.get("_explorer_export")
+        if export is not None and export[0] != export_state:
+            export = st.session_state._explorer_export = None
+        if export is None and st.button("📦 Prepare Excel Download"):
+            # the export covers every filtered row, with every page's edits spliced in
+            if n_pages > 1:
+                edited_df = pd.concat([
+                    edited_page if p == page else edits["pages"].get(p, page_rows(p))
+                    for p in range(1, n_pages + 1)
+                ])
+            else:
+                edited_df = edited_page
+
             # Determine filename based on Source_File column
             export_name = "pvj_filtered_data.xlsx"
             if "Source_File" in edited_df.columns:
@@ -328,13 +767,17 @@ elif selected_page == "Data Explorer":
                     base_name = os.path.splitext(unique_sources[0])[0]
                     export_name = f"{base_name}.xlsx"
 
-            with open(tmp_xls_path, "rb") as f:
-                st.download_button(
-                    label="⬇️ Download Excel",
-                    data=f,
-                    file_name=export_name,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+            with st.spinner("Building workbook..."):
+                data = build_xlsx_bytes(frame_digest(edited_df), edited_df)
+            export = st.session_state._explorer_export = (export_state, export_name, data)
+
+        if export is not None:
+            st.download_button(
+                label="⬇️ Download Excel",
+                data=export[2],
+                file_name=export[1],
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
 
 # --- ⚙️ Settings Page ---
 elif selected_page == "Settings":